@@ -17,10 +17,11 @@ applied context:
 
 from __future__ import annotations
 
+import collections.abc
 import logging
 from copy import deepcopy
 from dataclasses import dataclass
-from functools import partial
+from functools import cached_property, partial, singledispatch
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -35,6 +36,9 @@ from typing import (
 
 import numpy as np
 import pandas as pd
+from attrs import define, field
+from pandas.api.types import is_numeric_dtype
+from scipy.spatial import cKDTree
 
 try:
     import xyzpy as xyz
@@ -66,6 +70,17 @@ if TYPE_CHECKING:
 _logger = logging.getLogger(__name__)
 _DEFAULT_SEED = 1337
 
+# Relative and absolute tolerances up to which numerical parameter values are
+# considered identical when matching queries to a dataframe lookup, analogous to
+# ``np.isclose``. Both are small enough to keep distinct values apart even for
+# parameters of small magnitude, while absorbing floating point deviations.
+_LOOKUP_RTOL = 1e-9
+_LOOKUP_ATOL = 1e-12
+
+# Maximum number of elements compared at once when matching queries to a dataframe
+# lookup, which bounds the memory required for the intermediate arrays
+_MAX_MATCH_ELEMENTS = 2**22
+
 
 def simulate_transfer_learning(
     campaign: Campaign,
@@ -166,9 +181,10 @@ def simulate_scenarios(
     groupby: Optional[List[str]] = None,
     n_mc_iterations: int = 1,
     impute_mode: Literal[
-        "error", "worst", "best", "mean", "random", "ignore"
+        "error", "worst", "best", "mean", "random", "nearest", "ignore"
     ] = "error",
     noise_percent: Optional[float] = None,
+    vectorized_lookup: bool = False,
 ) -> pd.DataFrame:
     """Simulate multiple Bayesian optimization scenarios.
 
@@ -188,6 +204,7 @@ def simulate_scenarios(
         n_mc_iterations: The number of Monte Carlo simulations to be used.
         impute_mode: See :func:`baybe.simulation.simulate_experiment`.
         noise_percent: See :func:`baybe.simulation.simulate_experiment`.
+        vectorized_lookup: See :func:`baybe.simulation.simulate_experiment`.
 
     Returns:
         A dataframe like returned from :func:`baybe.simulation.simulate_experiment` but
@@ -237,6 +254,7 @@ def simulate_scenarios(
                 random_seed=Random_Seed,
                 impute_mode=impute_mode,
                 noise_percent=noise_percent,
+                vectorized_lookup=vectorized_lookup,
             )
         )
 
@@ -281,9 +299,10 @@ def _simulate_groupby(
     groupby: Optional[List[str]] = None,
     random_seed: int = _DEFAULT_SEED,
     impute_mode: Literal[
-        "error", "worst", "best", "mean", "random", "ignore"
+        "error", "worst", "best", "mean", "random", "nearest", "ignore"
     ] = "error",
     noise_percent: Optional[float] = None,
+    vectorized_lookup: bool = False,
 ) -> pd.DataFrame:
     """Scenario simulation for different search space partitions.
 
@@ -301,6 +320,7 @@ def _simulate_groupby(
         random_seed: See :func:`baybe.simulation.simulate_experiment`.
         impute_mode: See :func:`baybe.simulation.simulate_experiment`.
         noise_percent: See :func:`baybe.simulation.simulate_experiment`.
+        vectorized_lookup: See :func:`baybe.simulation.simulate_experiment`.
 
     Returns:
         A dataframe like returned from :func:`baybe.simulation.simulate_experiments`,
@@ -352,6 +372,7 @@ def _simulate_groupby(
                 random_seed=random_seed,
                 impute_mode=impute_mode,
                 noise_percent=noise_percent,
+                vectorized_lookup=vectorized_lookup,
             )
         except NothingToSimulateError:
             continue
@@ -382,9 +403,10 @@ def simulate_experiment(
     initial_data: Optional[pd.DataFrame] = None,
     random_seed: int = _DEFAULT_SEED,
     impute_mode: Literal[
-        "error", "worst", "best", "mean", "random", "ignore"
+        "error", "worst", "best", "mean", "random", "nearest", "ignore"
     ] = "error",
     noise_percent: Optional[float] = None,
+    vectorized_lookup: bool = False,
 ) -> pd.DataFrame:
     """Simulate a Bayesian optimization loop.
 
@@ -410,17 +432,26 @@ def simulate_experiment(
             loop.
         random_seed: The random seed used for the simulation.
         impute_mode: Specifies how a missing lookup will be handled.
-            There are six different options available.
+            There are seven different options available.
 
             - ``"error"``: An error will be thrown.
             - ``"worst"``: Imputation uses the worst available value for each target.
             - ``"best"``: Imputation uses the best available value for each target.
             - ``"mean"``: Imputation uses the mean value for each target.
             - ``"random"``: A random row will be used as lookup.
+            - ``"nearest"``: The closest row will be used as lookup. Categorical
+              parameters must match exactly, while the distance between numerical
+              parameters is measured after scaling them to the value ranges of the
+              lookup.
             - ``"ignore"``: The search space is stripped before recommendations are made
               so that unmeasured experiments will not be recommended.
         noise_percent: If not ``None``, relative noise in percent of
             ``noise_percent`` will be applied to the parameter measurements.
+        vectorized_lookup: Boolean flag indicating if a callable lookup supports
+            array inputs. If ``True``, the callable is invoked a single time per
+            batch of queries, with one array per parameter as arguments, and is
+            expected to return one array per target. Otherwise, it is invoked
+            separately for each query.
 
     Returns:
         A dataframe ready for plotting, see the ``Note`` for details.
@@ -481,15 +512,19 @@ def simulate_experiment(
     if initial_data is not None:
         campaign.add_measurements(initial_data)
 
+    # The lookup remains unchanged during the simulation, so its parameter columns are
+    # brought into the array form used for matching only once
+    if isinstance(lookup, pd.DataFrame):
+        lookup = _PreparedLookup.from_dataframe(
+            lookup, [p.name for p in campaign.parameters], campaign.targets
+        )
+
     # For impute_mode 'ignore', do not recommend space entries that are not
-    # available in the lookup
+    # available in the lookup, using the same matching rule as for the queries
     # TODO [16605]: Avoid direct manipulation of metadata
     if impute_mode == "ignore":
         searchspace = campaign.searchspace.discrete.exp_rep
-        missing_inds = searchspace.index[
-            searchspace.merge(lookup, how="left", indicator=True)["_merge"]
-            == "left_only"
-        ]
+        missing_inds = searchspace.index[~lookup.contains(searchspace)]
         campaign.searchspace.discrete.metadata.loc[
             missing_inds, "dont_recommend"
         ] = True
@@ -523,7 +558,9 @@ def simulate_experiment(
                 break
 
         n_experiments += len(measured)
-        _look_up_target_values(measured, campaign, lookup, impute_mode)
+        _look_up_target_values(
+            lookup, measured, campaign, impute_mode, vectorized=vectorized_lookup
+        )
 
         # Create the summary for the current iteration and store it
         result = pd.DataFrame(
@@ -591,182 +628,591 @@ def simulate_experiment(
     return results
 
 
+@define(frozen=True, slots=False, eq=False)
+class _PreparedLookup:
+    """A dataframe lookup whose parameter columns are prepared for matching.
+
+    Categorical parameters are represented by integer codes, numerical parameters by
+    their float values. Since the lookup remains unchanged throughout a simulation,
+    this conversion is carried out only once instead of for each batch of queries.
+    """
+
+    data: pd.DataFrame
+    """The lookup data frame."""
+
+    categorical: List[str]
+    """The names of the parameters represented by integer codes."""
+
+    numerical: List[str]
+    """The names of the parameters represented by float values."""
+
+    categories: List[pd.Index]
+    """The distinct lookup values of each categorical parameter, defining its codes."""
+
+    codes: np.ndarray
+    """The codes of the categorical parameter values contained in the lookup."""
+
+    values: np.ndarray
+    """The numerical parameter values contained in the lookup."""
+
+    target_values: np.ndarray
+    """The target values contained in the lookup."""
+
+    target_stats: pd.DataFrame
+    """The lookup statistics of each target required for data imputation."""
+
+    _trees: Dict[Tuple[int, ...], Tuple[np.ndarray, Optional[cKDTree]]] = field(
+        factory=dict, init=False, repr=False
+    )
+    """The k-d trees used for nearest neighbor search, together with the positions of
+    the lookup rows they contain, for each combination of categorical codes."""
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        lookup: pd.DataFrame,
+        parameter_names: List[str],
+        targets: List[NumericalTarget],
+    ) -> _PreparedLookup:
+        """Prepare a dataframe lookup for matching the given parameters.
+
+        Args:
+            lookup: The lookup data frame.
+            parameter_names: The names of the parameters used for matching.
+            targets: The targets to be looked up.
+
+        Returns:
+            The prepared lookup.
+        """
+        numerical = [c for c in parameter_names if is_numeric_dtype(lookup[c])]
+        categorical = [c for c in parameter_names if c not in numerical]
+        categories = [pd.Index(lookup[c].dropna().unique()) for c in categorical]
+
+        # Missing parameter values never match any query. For numerical parameters,
+        # this holds by construction since comparisons with NaN always fail. Missing
+        # categorical values, however, would share the code of query values that are
+        # unknown to the lookup and are thus given a code never assigned to queries.
+        codes = _encode_categories(lookup, categorical, categories)
+        codes[codes == -1] = -2
+
+        # Collect the values used for imputation. For targets to be matched, these are
+        # the values closest to and farthest from the center of their bounds.
+        target_stats = {}
+        for target in targets:
+            col = lookup[target.name]
+            target_stats[target.name] = {
+                "mean": col.mean(),
+                "min": col.min(),
+                "max": col.max(),
+            }
+            if target.mode is TargetMode.MATCH:
+                distances = (col - target.bounds.center).abs()
+                target_stats[target.name]["closest"] = col.iloc[distances.argmin()]
+                target_stats[target.name]["farthest"] = col.iloc[distances.argmax()]
+
+        return cls(
+            data=lookup,
+            categorical=categorical,
+            numerical=numerical,
+            categories=categories,
+            codes=codes,
+            values=lookup[numerical].to_numpy(dtype=float),
+            target_values=lookup[[t.name for t in targets]].to_numpy(dtype=float),
+            target_stats=pd.DataFrame(target_stats),
+        )
+
+    def encode(self, queries: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Bring the parameter columns of the given queries into matching form.
+
+        Args:
+            queries: The parameter configurations to be matched.
+
+        Returns:
+            The codes of the categorical parameter values, where ``-1`` marks values
+            that do not appear in the lookup, and the numerical parameter values.
+        """
+        return (
+            _encode_categories(queries, self.categorical, self.categories),
+            queries[self.numerical].to_numpy(dtype=float),
+        )
+
+    @cached_property
+    def _complete(self) -> np.ndarray:
+        """Boolean mask indicating the rows without missing numerical values."""
+        return ~np.isnan(self.values).any(axis=1)
+
+    @cached_property
+    def _index(self) -> Tuple[pd.MultiIndex, np.ndarray, np.ndarray]:
+        """Hash index of the distinct configurations of the complete lookup rows.
+
+        Along with the index, the position of the first lookup row and the number of
+        lookup rows are provided for each of its entries.
+        """
+        rows = np.flatnonzero(self._complete)
+        keys = _make_keys(self.codes[rows], self.values[rows])
+        first = ~keys.duplicated()
+        index = keys[first]
+        counts = np.bincount(index.get_indexer(keys), minlength=len(index))
+        return index, rows[first], counts
+
+    def find_exact_rows(
+        self, query_codes: np.ndarray, query_values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the lookup rows exactly matching the given encoded queries.
+
+        All queries are probed against the hash index of the lookup at once.
+
+        Args:
+            query_codes: The codes of the categorical parameter values of the queries.
+            query_values: The numerical parameter values of the queries.
+
+        Returns:
+            The positions of the first matching lookup rows, with ``-1`` indicating
+            that no match was found, and the numbers of matching lookup rows.
+        """
+        index, first, counts = self._index
+        keys = index.get_indexer(_make_keys(query_codes, query_values))
+        inds = np.full(len(keys), -1)
+        n_matches = np.zeros(len(keys), dtype=int)
+        found = keys != -1
+        inds[found] = first[keys[found]]
+        n_matches[found] = counts[keys[found]]
+        return inds, n_matches
+
+    @cached_property
+    def _scale(self) -> np.ndarray:
+        """The value ranges of the numerical parameters used for distance scaling."""
+        if not self._complete.any():
+            return np.ones(self.values.shape[1])
+        scale = np.ptp(self.values[self._complete], axis=0)
+        scale[scale == 0] = 1.0
+        return scale
+
+    def _get_tree(self, combo: Tuple[int, ...]) -> Tuple[np.ndarray, Optional[cKDTree]]:
+        """Get the k-d tree for the lookup rows with the given categorical codes.
+
+        The tree is built upon first request and reused for all subsequent batches of
+        queries.
+
+        Args:
+            combo: The codes of the categorical parameter values.
+
+        Returns:
+            The positions of the lookup rows with the given codes and the k-d tree
+            built from their scaled numerical values, or ``None`` if there are no
+            such rows.
+        """
+        if combo not in self._trees:
+            candidates = np.flatnonzero(
+                (self.codes == combo).all(axis=1) & self._complete
+            )
+            tree = (
+                cKDTree(self.values[candidates] / self._scale)
+                if len(candidates) > 0
+                else None
+            )
+            self._trees[combo] = (candidates, tree)
+        return self._trees[combo]
+
+    def contains(
+        self,
+        queries: pd.DataFrame,
+        rtol: float = _LOOKUP_RTOL,
+        atol: float = _LOOKUP_ATOL,
+    ) -> np.ndarray:
+        """Check which of the given queries can be matched to a lookup row.
+
+        Follows the same matching rule as :func:`baybe.simulation._match_lookup_rows`
+        but scales to large numbers of queries, as required for reducing an entire
+        search space. Queries without exact match are checked via the k-d trees,
+        whose nearest neighbors in terms of the maximum scaled deviation are the
+        candidates for a match within the tolerances.
+
+        Args:
+            queries: The parameter configurations to be matched.
+            rtol: The relative tolerance for numerical parameters.
+            atol: The absolute tolerance for numerical parameters.
+
+        Returns:
+            Boolean mask indicating the queries that can be matched.
+        """
+        query_codes, query_values = self.encode(queries)
+        _, n_matches = self.find_exact_rows(query_codes, query_values)
+        contained = n_matches > 0
+        if self.values.shape[1] == 0:
+            return contained
+
+        # Scaled deviation up to which numerical values can possibly match, with some
+        # headroom since the candidates are verified against the exact rule anyway
+        max_abs = np.nanmax(np.abs(self.values), axis=0, initial=0.0)
+        bound = 2 * np.max((atol + rtol * max_abs) / self._scale)
+
+        misses = ~contained & ~np.isnan(query_values).any(axis=1)
+        combos, combo_ids = np.unique(query_codes[misses], axis=0, return_inverse=True)
+        for k, combo in enumerate(combos):
+            candidates, tree = self._get_tree(tuple(combo))
+            if tree is None:
+                continue
+            in_combo = np.flatnonzero(misses)[combo_ids.ravel() == k]
+            _, nearest = tree.query(
+                query_values[in_combo] / self._scale,
+                p=np.inf,
+                distance_upper_bound=bound,
+            )
+            found = nearest < len(candidates)
+            rows = candidates[nearest[found]]
+            contained[in_combo[found]] = (
+                np.abs(self.values[rows] - query_values[in_combo[found]])
+                <= atol + rtol * np.abs(self.values[rows])
+            ).all(axis=1)
+
+        return contained
+
+    def find_nearest_rows(self, queries: pd.DataFrame) -> np.ndarray:
+        """Find the lookup rows closest to the given queries.
+
+        Only lookup rows with identical categorical parameter values are considered.
+        Among those, the closest row is determined in terms of the Euclidean distance
+        between the numerical parameters, which are scaled to the value ranges of the
+        lookup. The search is carried out for all queries at once, using one k-d tree
+        per combination of categorical values.
+
+        Args:
+            queries: The parameter configurations to be matched.
+
+        Returns:
+            The positions of the closest lookup rows, with ``-1`` indicating that no
+            suitable row exists, either because the lookup contains no row with the
+            same categorical values or because of missing values.
+        """
+        query_codes, query_values = self.encode(queries)
+        query_complete = ~np.isnan(query_values).any(axis=1)
+
+        inds = np.full(len(queries), -1)
+        combos, combo_ids = np.unique(query_codes, axis=0, return_inverse=True)
+        for k, combo in enumerate(combos):
+            in_combo = (combo_ids.ravel() == k) & query_complete
+            candidates, tree = self._get_tree(tuple(combo))
+            if (tree is None) or (not in_combo.any()):
+                continue
+            _, nearest = tree.query(query_values[in_combo] / self._scale)
+            inds[in_combo] = candidates[nearest]
+
+        return inds
+
+
+def _make_keys(codes: np.ndarray, values: np.ndarray) -> pd.MultiIndex:
+    """Combine encoded parameter configurations into hashable index keys.
+
+    Args:
+        codes: The codes of the categorical parameter values.
+        values: The numerical parameter values.
+
+    Returns:
+        The index containing one key per configuration.
+    """
+    return pd.MultiIndex.from_arrays([*codes.T, *values.T])
+
+
+def _encode_categories(
+    df: pd.DataFrame, columns: List[str], categories: List[pd.Index]
+) -> np.ndarray:
+    """Replace the values of the given columns with their positions in the categories.
+
+    Args:
+        df: The data frame containing the columns to be encoded.
+        columns: The names of the columns to be encoded.
+        categories: The categories of each column.
+
+    Returns:
+        The integer codes, with one column per encoded column.
+    """
+    codes = np.empty((len(df), len(columns)), dtype=np.int64)
+    for k, (col, cats) in enumerate(zip(columns, categories)):
+        codes[:, k] = cats.get_indexer(df[col])
+    return codes
+
+
+@singledispatch
 def _look_up_target_values(
+    lookup: Optional[Union[pd.DataFrame, _PreparedLookup, Callable]],
     queries: pd.DataFrame,
     campaign: Campaign,
-    lookup: Optional[Union[pd.DataFrame, Callable]] = None,
     impute_mode: Literal[
-        "error", "worst", "best", "mean", "random", "ignore"
+        "error", "worst", "best", "mean", "random", "nearest", "ignore"
     ] = "error",
-):
+    vectorized: bool = False,
+) -> None:
     """Fill the target values in the query dataframe using the lookup mechanism.
 
     Note that this does not create a new dataframe but modifies ``queries`` in-place.
+    The applied lookup mechanism is selected based on the type of ``lookup``.
 
     Args:
+        lookup: The lookup mechanism. See :func:`baybe.simulation.simulate_scenarios`
+            for details. Dataframe lookups can also be passed in prepared form.
         queries: A dataframe containing points to be queried.
         campaign: The campaign for which the experiments should be simulated.
-        lookup: The lookup mechanism. See :func:`baybe.simulation.simulate_scenarios`
-            for details.
         impute_mode: The used impute mode. See
             :func:`baybe.simulation.simulate_scenarios` for details.
+        vectorized: Boolean flag indicating if a callable lookup supports array
+            inputs. See :func:`baybe.simulation.simulate_experiment` for details.
 
     Raises:
-        AssertionError: If an analytical function is used and an incorrect number of
-            targets was specified.
+        TypeError: If the type of the lookup is not supported.
     """
-    # TODO: This function needs another code cleanup and refactoring. In particular,
-    #   the different lookup modes should be implemented via multiple dispatch.
+    raise TypeError(f"Unsupported lookup type: {type(lookup)}")
 
-    # Extract all target names
-    target_names = [t.name for t in campaign.targets]
 
-    # If no lookup is provided, invent some fake results
-    if lookup is None:
-        add_fake_results(queries, campaign)
-
-    # Compute the target values via a callable
-    elif isinstance(lookup, Callable):
-        # TODO: Currently, the alignment of return values to targets is based on the
-        #   column ordering, which is not robust. Instead, the callable should return
-        #   a dataframe with properly labeled columns.
-
-        # Since the return of a lookup function is a a tuple, the following code stores
-        # tuples of floats in a single column with label 0:
-        measured_targets = queries.apply(lambda x: lookup(*x.values), axis=1).to_frame()
-        # We transform this column to a DataFrame in which there is an individual
-        # column for each of the targets....
-        split_target_columns = pd.DataFrame(
-            measured_targets[0].to_list(), index=measured_targets.index
+@_look_up_target_values.register(type(None))
+def _(lookup, queries, campaign, impute_mode="error", vectorized=False):
+    """Overloaded implementation inventing fake results."""
+    add_fake_results(queries, campaign)
+
+
+@_look_up_target_values.register(collections.abc.Callable)
+def _(lookup, queries, campaign, impute_mode="error", vectorized=False):
+    """Overloaded implementation computing the target values via a callable."""
+    # TODO: Currently, the alignment of return values to targets is based on the
+    #   column ordering, which is not robust. Instead, the callable should return
+    #   a dataframe with properly labeled columns.
+
+    if len(queries) == 0:
+        measured_targets = np.empty((0, len(campaign.targets)))
+    else:
+        measured_targets = _evaluate_callable_lookup(lookup, queries, vectorized)
+    if measured_targets.shape[1] != len(campaign.targets):
+        raise AssertionError(
+            "If you use an analytical function as lookup, make sure "
+            "the configuration has the right amount of targets "
+            "specified."
         )
-        # ... and assign this to measured_targets in order to have one column per target
-        measured_targets[split_target_columns.columns] = split_target_columns
-        if measured_targets.shape[1] != len(campaign.targets):
+    for k_target, target in enumerate(campaign.targets):
+        queries[target.name] = measured_targets[:, k_target]
+
+
+@_look_up_target_values.register(pd.DataFrame)
+def _(lookup, queries, campaign, impute_mode="error", vectorized=False):
+    """Overloaded implementation preparing the dataframe lookup on the fly."""
+    prepared = _PreparedLookup.from_dataframe(
+        lookup, list(queries.columns), campaign.targets
+    )
+    _look_up_target_values(prepared, queries, campaign, impute_mode)
+
+
+@_look_up_target_values.register(_PreparedLookup)
+def _(lookup, queries, campaign, impute_mode="error", vectorized=False):
+    """Overloaded implementation retrieving the target values from the lookup."""
+    # Only matches up to a small tolerance are retrieved, the remaining queries are
+    # subject to imputation
+    inds = _match_lookup_rows(queries, lookup)
+    missing = inds == -1
+
+    target_names = [t.name for t in campaign.targets]
+    match_vals = np.empty((len(queries), len(target_names)))
+    match_vals[~missing] = lookup.target_values[inds[~missing]]
+
+    if missing.any():
+        # Some parameter combinations cannot be looked up and need to be imputed
+        if impute_mode == "ignore":
             raise AssertionError(
-                "If you use an analytical function as lookup, make sure "
-                "the configuration has the right amount of targets "
-                "specified."
+                "Something went wrong for impute_mode 'ignore'. "
+                "It seems the search space was not correctly "
+                "reduced before recommendations were generated."
             )
-        for k_target, target in enumerate(campaign.targets):
-            queries[target.name] = measured_targets.iloc[:, k_target]
-
-    # Get results via dataframe lookup (works only for exact matches)
-    # IMPROVE: Although its not too important for a simulation, this
-    #  could also be implemented for approximate matches
-    elif isinstance(lookup, pd.DataFrame):
-        all_match_vals = []
-        for _, row in queries.iterrows():
-            # IMPROVE: to the entire matching at once via a merge
-            ind = lookup[
-                (lookup.loc[:, row.index] == row).all(axis=1, skipna=False)
-            ].index.values
-
-            if len(ind) > 1:
-                # More than two instances of this parameter combination
-                # have been measured
-                _logger.warning(
-                    "The lookup rows with indexes %s seem to be "
-                    "duplicates regarding parameter values. Choosing a "
-                    "random one.",
-                    ind,
-                )
-                match_vals = lookup.loc[np.random.choice(ind), target_names].values
-
-            elif len(ind) < 1:
-                # Parameter combination cannot be looked up and needs to be
-                # imputed.
-                if impute_mode == "ignore":
-                    raise AssertionError(
-                        "Something went wrong for impute_mode 'ignore'. "
-                        "It seems the search space was not correctly "
-                        "reduced before recommendations were generated."
-                    )
-                match_vals = _impute_lookup(row, lookup, campaign.targets, impute_mode)
-
-            else:
-                # Exactly one match has been found
-                match_vals = lookup.loc[ind[0], target_names].values
-
-            # Collect the matches
-            all_match_vals.append(match_vals)
-
-        # Add the lookup values
-        queries.loc[:, target_names] = np.asarray(all_match_vals)
+        match_vals[missing] = _impute_lookup(
+            queries.loc[missing], lookup, campaign.targets, impute_mode
+        )
+
+    # Add the lookup values
+    queries.loc[:, target_names] = match_vals
+
+
+def _match_lookup_rows(
+    queries: pd.DataFrame,
+    lookup: _PreparedLookup,
+    rtol: float = _LOOKUP_RTOL,
+    atol: float = _LOOKUP_ATOL,
+) -> np.ndarray:
+    """Match queries to the lookup rows with identical parameter configurations.
+
+    Categorical parameters are compared via their integer codes and must match
+    exactly, while numerical parameters may deviate up to the given tolerances, i.e.,
+    a query value ``a`` matches a lookup value ``b`` if
+    ``|a - b| <= atol + rtol * |b|``. If several lookup rows match a query, one of
+    them is chosen at random.
+
+    All queries are first probed against the hash index of the lookup. Only the
+    queries without exact match are compared against the entire lookup within the
+    tolerances, which is carried out for chunks of queries at once by broadcasting
+    them against the lookup.
+
+    Args:
+        queries: The parameter configurations to be matched.
+        lookup: The prepared lookup.
+        rtol: The relative tolerance for numerical parameters.
+        atol: The absolute tolerance for numerical parameters.
+
+    Returns:
+        The positions of the matched lookup rows, with ``-1`` indicating that no match
+        was found.
+    """
+    query_codes, query_values = lookup.encode(queries)
+    inds, n_matches = lookup.find_exact_rows(query_codes, query_values)
+
+    # Without numerical parameters, the exact matches are all there is
+    misses = np.flatnonzero(n_matches == 0)
+    if lookup.values.shape[1] == 0:
+        misses = misses[:0]
+
+    elements_per_query = max(lookup.codes.size + lookup.values.size, 1)
+    chunk_size = max(_MAX_MATCH_ELEMENTS // elements_per_query, 1)
+    for start in range(0, len(misses), chunk_size):
+        chunk = misses[start : start + chunk_size]
+        matches = _find_close_rows(
+            lookup, query_codes[chunk], query_values[chunk], rtol, atol
+        )
+        n_matches[chunk] = matches.sum(axis=1)
+        inds[chunk] = np.where(n_matches[chunk] > 0, matches.argmax(axis=1), -1)
+
+    for k in np.flatnonzero(n_matches > 1):
+        # More than two instances of this parameter combination have been measured
+        duplicates = np.flatnonzero(
+            _find_close_rows(lookup, query_codes[[k]], query_values[[k]], rtol, atol)[0]
+        )
+        _logger.warning(
+            "The lookup rows with indexes %s seem to be "
+            "duplicates regarding parameter values. Choosing a "
+            "random one.",
+            lookup.data.index[duplicates].values,
+        )
+        inds[k] = np.random.choice(duplicates)
+
+    return inds
+
+
+def _find_close_rows(
+    lookup: _PreparedLookup,
+    query_codes: np.ndarray,
+    query_values: np.ndarray,
+    rtol: float,
+    atol: float,
+) -> np.ndarray:
+    """Compare encoded queries against all lookup rows within the given tolerances.
+
+    Args:
+        lookup: The prepared lookup.
+        query_codes: The codes of the categorical parameter values of the queries.
+        query_values: The numerical parameter values of the queries.
+        rtol: The relative tolerance for numerical parameters.
+        atol: The absolute tolerance for numerical parameters.
+
+    Returns:
+        A boolean matrix indicating which lookup rows (columns) match which queries
+        (rows).
+    """
+    return (lookup.codes[None] == query_codes[:, None]).all(axis=2) & (
+        np.abs(lookup.values[None] - query_values[:, None])
+        <= atol + rtol * np.abs(lookup.values[None])
+    ).all(axis=2)
+
+
+def _evaluate_callable_lookup(
+    lookup: Callable, queries: pd.DataFrame, vectorized: bool = False
+) -> np.ndarray:
+    """Evaluate a callable lookup for all given queries.
+
+    Vectorized callables are invoked a single time with the entire parameter columns
+    as arguments. All other callables are invoked row by row.
+
+    Args:
+        lookup: The lookup callable, returning a float or a tuple of floats.
+        queries: A dataframe containing points to be queried.
+        vectorized: Boolean flag indicating if the callable supports array inputs.
+
+    Returns:
+        The lookup results, containing one row per query and one column per value
+        returned by the callable.
+
+    Raises:
+        ValueError: If a vectorized callable does not return one value per query for
+            each of its outputs.
+    """
+    params = queries.to_numpy()
+    if not vectorized:
+        return np.array([np.atleast_1d(lookup(*row)) for row in params], dtype=float)
+
+    # Multiple return values are expected in the form of one array per value
+    results = np.asarray(lookup(*params.T), dtype=float)
+    if (results.ndim > 2) or (np.atleast_1d(results).shape[-1] != len(params)):
+        raise ValueError(
+            f"A vectorized lookup called with {len(params)} queries must return "
+            f"one value per query for each target, but returned an array of shape "
+            f"{results.shape}."
+        )
+    return results.reshape(-1, len(params)).T
 
 
 def _impute_lookup(
-    row: pd.Series,
-    lookup: pd.DataFrame,
+    rows: pd.DataFrame,
+    lookup: _PreparedLookup,
     targets: List[NumericalTarget],
-    mode: Literal["error", "best", "worst", "mean", "random"] = "error",
+    mode: Literal["error", "best", "worst", "mean", "random", "nearest"] = "error",
 ) -> np.ndarray:
     """Perform data imputation for missing lookup values.
 
-    Depending on the chosen mode, this might raise errors instead.
+    Depending on the chosen mode, this might raise errors instead. All rows are imputed
+    at once, based on the target statistics precomputed for the lookup.
 
     Args:
-        row: The data that should be matched with the lookup data frame.
-        lookup: The lookup data frame.
+        rows: The data that could not be matched with the lookup data frame.
+        lookup: The prepared lookup.
         targets: The campaign targets, providing the required mode information.
         mode: The used impute mode. See :func:`baybe.simulation.simulate_scenarios`
             for details.
 
     Returns:
-        The filled-in lookup results.
+        The filled-in lookup results, containing one row per entry in ``rows`` and one
+        column per target.
 
     Raises:
         IndexError: If the mode ``"error"`` is chosen and at least one of the targets
             could not be found.
+        IndexError: If the mode ``"nearest"`` is chosen and the lookup contains no
+            suitable entry for some row.
     """
-    # TODO: this function needs another code cleanup and refactoring
+    # Random imputation draws an individual lookup row for each missing row
+    if mode == "random":
+        rand_inds = np.random.choice(len(lookup.target_values), size=len(rows))
+        return lookup.target_values[rand_inds]
+
+    if mode == "nearest":
+        nearest_inds = lookup.find_nearest_rows(rows)
+        if (nearest_inds == -1).any():
+            raise IndexError(
+                "Cannot match the recommended rows "
+                f"{rows[nearest_inds == -1]} to any of the rows in the lookup "
+                "since their categorical parameter values do not appear in the "
+                "lookup or they contain missing values."
+            )
+        return lookup.target_values[nearest_inds]
 
-    target_names = [t.name for t in targets]
-    if mode == "mean":
-        match_vals = lookup.loc[:, target_names].mean(axis=0).values
-    elif mode == "worst":
-        worst_vals = []
-        for target in targets:
-            if target.mode is TargetMode.MAX:
-                worst_vals.append(lookup.loc[:, target.name].min().flatten()[0])
-            elif target.mode is TargetMode.MIN:
-                worst_vals.append(lookup.loc[:, target.name].max().flatten()[0])
-            if target.mode is TargetMode.MATCH:
-                worst_vals.append(
-                    lookup.loc[
-                        lookup.loc[
-                            (lookup[target.name] - target.bounds.center).abs().idxmax(),
-                        ],
-                        target.name,
-                    ].flatten()[0]
-                )
-        match_vals = np.array(worst_vals)
-    elif mode == "best":
-        best_vals = []
-        for target in targets:
-            if target.mode is TargetMode.MAX:
-                best_vals.append(lookup.loc[:, target.name].max().flatten()[0])
-            elif target.mode is TargetMode.MIN:
-                best_vals.append(lookup.loc[:, target.name].min().flatten()[0])
-            if target.mode is TargetMode.MATCH:
-                best_vals.append(
-                    lookup.loc[
-                        lookup.loc[
-                            (lookup[target.name] - target.bounds.center).abs().idxmin(),
-                        ],
-                        target.name,
-                    ].flatten()[0]
-                )
-        match_vals = np.array(best_vals)
-    elif mode == "random":
-        vals = []
-        randindex = np.random.choice(lookup.index)
-        for target in targets:
-            vals.append(lookup.loc[randindex, target.name].flatten()[0])
-        match_vals = np.array(vals)
-    else:
+    if mode not in ("mean", "best", "worst"):
         raise IndexError(
-            f"Cannot match the recommended row {row} to any of "
+            f"Cannot match the recommended rows {rows} to any of "
             f"the rows in the lookup."
         )
 
-    return match_vals
+    # All remaining modes impute the same values for all missing rows
+    imputed_vals = []
+    for target in targets:
+        if mode == "mean":
+            stat = "mean"
+        elif target.mode is TargetMode.MATCH:
+            stat = "closest" if mode == "best" else "farthest"
+        else:
+            use_max = (target.mode is TargetMode.MAX) == (mode == "best")
+            stat = "max" if use_max else "min"
+        imputed_vals.append(lookup.target_stats.loc[stat, target.name])
+
+    return np.tile(imputed_vals, (len(rows), 1))
@@ -118,6 +118,7 @@ scenarios = {"Test_Scenario": campaign, "Random": campaign_rand}
 #   * `"best"`: imputation using the best available value for each target
 #   * `"mean"`: imputation using mean value for each target
 #   * `"random"`: a random row will be used as lookup
+#   * `"nearest"`: the closest row will be used as lookup
 #   * `"ignore"`: the search space is stripped before recommendations are made
 #       so that unmeasured experiments will not be recommended
 
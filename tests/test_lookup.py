@@ -0,0 +1,218 @@
+"""Tests for the lookup mechanism used in simulations."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baybe.campaign import Campaign
+from baybe.objective import Objective
+from baybe.parameters import CategoricalParameter, NumericalDiscreteParameter
+from baybe.searchspace import SearchSpace
+from baybe.simulation import _look_up_target_values, _PreparedLookup
+from baybe.targets import NumericalTarget
+
+_TARGET = "Target"
+
+
+@pytest.fixture(name="lookup_campaign")
+def fixture_lookup_campaign():
+    """A small campaign with one numerical and one categorical parameter."""
+    parameters = [
+        NumericalDiscreteParameter(name="Num", values=(1.0, 2.0, 3.0)),
+        CategoricalParameter(name="Cat", values=("a", "b")),
+    ]
+    return Campaign(
+        searchspace=SearchSpace.from_product(parameters),
+        objective=Objective(
+            mode="SINGLE", targets=[NumericalTarget(name=_TARGET, mode="MAX")]
+        ),
+    )
+
+
+@pytest.fixture(name="lookup")
+def fixture_lookup():
+    """A lookup covering all but one configuration of the campaign."""
+    return pd.DataFrame(
+        {
+            "Num": [1.0, 1.0, 2.0, 2.0, 3.0],
+            "Cat": ["a", "b", "a", "b", "a"],
+            _TARGET: [10.0, 20.0, 30.0, 40.0, 50.0],
+        }
+    )
+
+
+def test_exact_matches(lookup_campaign, lookup):
+    """Matched target values are assigned in the order of the queries."""
+    queries = pd.DataFrame({"Num": [3.0, 1.0, 2.0], "Cat": ["a", "b", "b"]})
+    _look_up_target_values(lookup, queries, lookup_campaign)
+    assert queries[_TARGET].to_list() == [50.0, 20.0, 40.0]
+
+
+def test_duplicates_in_lookup(lookup_campaign, lookup):
+    """Duplicate lookup configurations are resolved to one of their values."""
+    lookup = pd.concat(
+        [lookup, lookup.iloc[[0]].assign(**{_TARGET: 15.0})], ignore_index=True
+    )
+    queries = pd.DataFrame({"Num": [1.0], "Cat": ["a"]})
+    _look_up_target_values(lookup, queries, lookup_campaign)
+    assert queries[_TARGET].iloc[0] in (10.0, 15.0)
+
+
+@pytest.mark.parametrize(
+    ("impute_mode", "expected"),
+    [("mean", 30.0), ("best", 50.0), ("worst", 10.0)],
+)
+def test_imputation(lookup_campaign, lookup, impute_mode, expected):
+    """Configurations missing in the lookup are imputed according to the mode."""
+    queries = pd.DataFrame({"Num": [3.0, 1.0], "Cat": ["b", "a"]})
+    _look_up_target_values(lookup, queries, lookup_campaign, impute_mode)
+    assert queries[_TARGET].to_list() == [expected, 10.0]
+
+
+def test_random_imputation(lookup_campaign, lookup):
+    """Random imputation draws values from the lookup."""
+    queries = pd.DataFrame({"Num": [3.0, 3.0], "Cat": ["b", "b"]})
+    _look_up_target_values(lookup, queries, lookup_campaign, "random")
+    assert np.isin(queries[_TARGET], lookup[_TARGET]).all()
+
+
+def test_missing_configuration_raises(lookup_campaign, lookup):
+    """Missing configurations raise an error in the default impute mode."""
+    queries = pd.DataFrame({"Num": [3.0], "Cat": ["b"]})
+    with pytest.raises(IndexError):
+        _look_up_target_values(lookup, queries, lookup_campaign)
+
+
+@pytest.mark.parametrize(
+    ("function", "vectorized"),
+    [
+        pytest.param(lambda num, cat: num * (cat == "a"), True, id="vectorized"),
+        pytest.param(
+            lambda num, cat: float(num) if cat == "a" else 0.0, False, id="scalar"
+        ),
+    ],
+)
+def test_callable_lookup(lookup_campaign, function, vectorized):
+    """Vectorized and scalar-only callables yield identical target values."""
+    queries = pd.DataFrame({"Num": [3.0, 1.0, 2.0], "Cat": ["a", "b", "a"]})
+    _look_up_target_values(function, queries, lookup_campaign, vectorized=vectorized)
+    assert queries[_TARGET].to_list() == [3.0, 0.0, 2.0]
+
+
+def test_vectorized_callable_lookup_single_call(lookup_campaign):
+    """Vectorized callables are evaluated with a single call for all queries."""
+    calls = []
+
+    def function(num, cat):
+        calls.append(num)
+        return num + np.random.normal(size=np.shape(num))
+
+    queries = pd.DataFrame({"Num": [3.0, 1.0, 2.0, 1.0], "Cat": ["a", "b", "a", "a"]})
+    _look_up_target_values(function, queries, lookup_campaign, vectorized=True)
+    assert len(calls) == 1
+    assert queries[_TARGET].notna().all()
+
+
+def test_scalar_callable_lookup_accepting_arrays(lookup_campaign):
+    """Callables not flagged as vectorized are evaluated row by row."""
+    lookup_campaign.objective = Objective(
+        mode="DESIRABILITY",
+        targets=[
+            NumericalTarget(name=f"Target_{k}", mode="MAX", bounds=(0, 100))
+            for k in range(2)
+        ],
+    )
+
+    def function(*x):
+        y = np.asarray(x, dtype=float) @ np.array([1.0, 2.0])
+        return y, 2 * y
+
+    queries = pd.DataFrame({"Num": [3.0, 1.0], "Num2": [1.0, 3.0]})
+    _look_up_target_values(function, queries, lookup_campaign)
+    assert queries["Target_0"].to_list() == [5.0, 7.0]
+    assert queries["Target_1"].to_list() == [10.0, 14.0]
+
+
+def test_callable_lookup_wrong_number_of_targets(lookup_campaign):
+    """Callables returning more values than there are targets raise an error."""
+    queries = pd.DataFrame({"Num": [3.0, 1.0], "Cat": ["a", "b"]})
+    with pytest.raises(AssertionError):
+        _look_up_target_values(lambda num, cat: (num, num), queries, lookup_campaign)
+
+
+def test_approximate_matches(lookup_campaign, lookup):
+    """Numerical values are matched up to floating point deviations."""
+    queries = pd.DataFrame({"Num": [3.0 + 1e-9, 1.0 - 1e-9, 2.1], "Cat": ["a"] * 3})
+    _look_up_target_values(lookup, queries, lookup_campaign, "worst")
+    assert queries[_TARGET].to_list() == [50.0, 10.0, 10.0]
+
+
+@pytest.mark.parametrize(("impute_mode", "expected"), [("best", 30.0), ("worst", 10.0)])
+def test_imputation_match_target(lookup_campaign, lookup, impute_mode, expected):
+    """Targets to be matched are imputed based on their distance to the center."""
+    lookup_campaign.objective = Objective(
+        mode="SINGLE",
+        targets=[NumericalTarget(name=_TARGET, mode="MATCH", bounds=(0, 64))],
+    )
+    queries = pd.DataFrame({"Num": [3.0], "Cat": ["b"]})
+    _look_up_target_values(lookup, queries, lookup_campaign, impute_mode)
+    assert queries[_TARGET].to_list() == [expected]
+
+
+def test_nearest_imputation(lookup_campaign, lookup):
+    """Nearest imputation uses the closest entry with identical categories."""
+    queries = pd.DataFrame({"Num": [2.9, 1.2], "Cat": ["b", "a"]})
+    _look_up_target_values(lookup, queries, lookup_campaign, "nearest")
+    assert queries[_TARGET].to_list() == [40.0, 10.0]
+
+
+def test_nearest_imputation_unknown_category(lookup_campaign, lookup):
+    """Nearest imputation fails if no entry with identical categories exists."""
+    queries = pd.DataFrame({"Num": [2.0], "Cat": ["c"]})
+    with pytest.raises(IndexError):
+        _look_up_target_values(lookup, queries, lookup_campaign, "nearest")
+
+
+def test_unsupported_lookup_type(lookup_campaign):
+    """Lookups of unsupported type raise an error."""
+    queries = pd.DataFrame({"Num": [3.0], "Cat": ["a"]})
+    with pytest.raises(TypeError):
+        _look_up_target_values([1.0], queries, lookup_campaign)
+
+
+def test_missing_values_do_not_match(lookup_campaign, lookup):
+    """Missing parameter values are never considered a match."""
+    lookup.loc[0, "Num"] = np.nan
+    lookup.loc[1, "Cat"] = np.nan
+    queries = pd.DataFrame({"Num": [np.nan, 1.0], "Cat": ["a", np.nan]})
+    _look_up_target_values(lookup, queries, lookup_campaign, "mean")
+    assert queries[_TARGET].to_list() == [30.0, 30.0]
+
+
+def test_chunked_matching(lookup_campaign, lookup, monkeypatch):
+    """Matching the inexact queries in chunks yields the same results."""
+    monkeypatch.setattr("baybe.simulation._MAX_MATCH_ELEMENTS", 1)
+    queries = pd.DataFrame(
+        {"Num": [3.0 + 1e-12, 1.0 - 1e-12, 2.0], "Cat": ["a", "b", "b"]}
+    )
+    _look_up_target_values(lookup, queries, lookup_campaign)
+    assert queries[_TARGET].to_list() == [50.0, 20.0, 40.0]
+
+
+def test_small_values_do_not_match(lookup_campaign):
+    """Distinct numerical values of small magnitude are not considered identical."""
+    lookup = pd.DataFrame({"Num": [1e-7, 5e-7], _TARGET: [1.0, 2.0]})
+    queries = pd.DataFrame({"Num": [5e-7, 1e-7, 3e-7]})
+    _look_up_target_values(lookup, queries, lookup_campaign, "worst")
+    assert queries[_TARGET].to_list() == [2.0, 1.0, 1.0]
+
+
+def test_lookup_contains(lookup_campaign, lookup):
+    """Containment follows the same matching rule as the lookup itself."""
+    prepared = _PreparedLookup.from_dataframe(
+        lookup, ["Num", "Cat"], lookup_campaign.targets
+    )
+    queries = pd.DataFrame(
+        {"Num": [3.0 + 1e-12, 3.0, 2.0 + 1e-6, np.nan], "Cat": ["a", "b", "b", "a"]}
+    )
+    assert prepared.contains(queries).tolist() == [True, False, False, False]